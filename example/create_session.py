@@ -19,17 +19,19 @@ start = pd.Timestamp("now")
 # the minimum to add data to a session:
 #   - dataframe with a datetime index
 #   - a column with data in doubles
-df = pd.DataFrame()
-df.index = pd.date_range(start, periods=1000, freq="s")
-df.loc[:, "Param 1"] = np.sin(np.linspace(0, 10 * np.pi, num=1000))
+df = pd.DataFrame(
+    {"Param 1": np.sin(np.linspace(0, 10 * np.pi, num=1000))},
+    index=pd.date_range(start, periods=1000, freq="s"),
+)
 
 # some optional extras
 #   - change the app group name
 #   - change the parameter group name
 #   - disable the progress bars
-df2 = pd.DataFrame()
-df2.index = pd.date_range(start, periods=100, freq="10s")
-df2.loc[:, "Param 2"] = np.sin(np.linspace(0, 10 * np.pi, num=100))
+df2 = pd.DataFrame(
+    {"Param 2": np.sin(np.linspace(0, 10 * np.pi, num=100))},
+    index=pd.date_range(start, periods=100, freq="10s"),
+)
 df2.atlas.ParameterGroupIdentifier = "Sub group 1"
 df2.atlas.ApplicationGroupName = "AppGroup2"
 df2.atlas.descriptions = {"Param 2:AppGroup2": "Custom Description"}
@@ -7,6 +7,7 @@ import pandas as pd
 
 import pandlas.SqlRace as sr
 from pandlas import SQLiteConnection, SQLRaceDBConnection
+from pandlas.utils import timestamp2long
 from tqdm import trange
 
 logging.basicConfig(level=logging.INFO)
@@ -15,35 +16,71 @@ db_location = r"C:\McLaren Applied\pandlas\ExampleSessions.ssndb"
 session_identifier = "Live Session Demo"
 
 cols = ["sin", "cos"]
+# number of samples buffered before they are flushed to the session in one write
+batch_size = 10
+n_samples = 1200
+# seconds between samples
+period = 0.1
+# the signals are known up front, so compute them in one go rather than per tick
+x = np.arange(n_samples) / 100
+signals = np.column_stack([np.sin(x), np.cos(x)])
 
 # Open the session with the recorder set to true to enable live.
 with SQLiteConnection(
     db_location, session_identifier, mode="w", recorder=True
 ) as session:
-    # write data to the session as you would in historic, keeping the same column names.
-    # pandlas would use the column names and app name to write the data to the right
-    # channels.
-    for i in trange(1200):
-        now = pd.Timestamp.now()
+    # write the first sample as you would in historic, so pandlas creates the channels
+    # from the column names and app name.
+    now = pd.Timestamp.now()
+    sr.add_lap(session, now, 1)
+    df = pd.DataFrame(data=signals[:1], index=[now], columns=cols)
+    df.atlas.to_atlas_session(session, show_progress_bar=False)
+    channel_ids = [df.atlas.paramchannelID[col] for col in cols]
+    # then buffer the new samples and write them straight to those channels once per
+    # batch, rather than building a new DataFrame and writing on every tick.
+    timestamps = np.empty(batch_size, dtype="datetime64[ns]")
+    # schedule each tick from the start time, so time spent writing does not drift the
+    # sample rate.
+    t0 = time.perf_counter()
+    for i in trange(1, n_samples):
+        time.sleep(max(0.0, t0 + i * period - time.perf_counter()))
+        k = (i - 1) % batch_size
+        timestamps[k] = pd.Timestamp.now().to_datetime64()
         if (i % 100) == 0:
-            sr.add_lap(session, now, i // 100 + 1)
-        df = pd.DataFrame(
-            data=[[np.sin(i / 100), np.cos(i / 100)]], index=[now], columns=cols
-        )
-        df.atlas.to_atlas_session(session, show_progress_bar=False)
-        time.sleep(0.1)
+            sr.add_lap(session, pd.Timestamp(timestamps[k]), i // 100 + 1)
+        if k == batch_size - 1 or i == n_samples - 1:
+            index = pd.DatetimeIndex(timestamps[: k + 1])
+            sr.write_samples(
+                session,
+                channel_ids,
+                timestamp2long(index, start_date=now),
+                signals[i - k : i + 1],
+            )
 
 # Open the session with the recorder set to true to enable live.
 with SQLRaceDBConnection(
     r"MCLA-5JRZTQ3\LOCAL", "SQLRACE01", session_identifier, mode="w", recorder=True
 ) as session:
-    # write data to the session as you would in historic, keeping the same column names.
-    # pandlas would use the column names and app name to write the data to the right
-    # channels.
-    for i in trange(1200):
-        now = pd.Timestamp.now()
-        df = pd.DataFrame(
-            data=[[np.sin(i / 100), np.cos(i / 100)]], index=[now], columns=cols
-        )
-        df.atlas.to_atlas_session(session, show_progress_bar=False)
-        time.sleep(0.1)
+    # write the first sample as you would in historic, so pandlas creates the channels
+    # from the column names and app name.
+    now = pd.Timestamp.now()
+    df = pd.DataFrame(data=signals[:1], index=[now], columns=cols)
+    df.atlas.to_atlas_session(session, show_progress_bar=False)
+    channel_ids = [df.atlas.paramchannelID[col] for col in cols]
+    # then buffer the new samples and append them straight to those channels.
+    timestamps = np.empty(batch_size, dtype="datetime64[ns]")
+    # schedule each tick from the start time, so time spent writing does not drift the
+    # sample rate.
+    t0 = time.perf_counter()
+    for i in trange(1, n_samples):
+        time.sleep(max(0.0, t0 + i * period - time.perf_counter()))
+        k = (i - 1) % batch_size
+        timestamps[k] = pd.Timestamp.now().to_datetime64()
+        if k == batch_size - 1 or i == n_samples - 1:
+            index = pd.DatetimeIndex(timestamps[: k + 1])
+            sr.write_samples(
+                session,
+                channel_ids,
+                timestamp2long(index, start_date=now),
+                signals[i - k : i + 1],
+            )
@@ -19,6 +19,9 @@ session_identifier = "Live ISS Demo"
 cols = ["sin", "cos"]
 
 WTIA_ENDPOINT = r"https://api.wheretheiss.at/v1/satellites/25544"
+# reuse one connection for every poll, rather than a new TCP and TLS handshake each time
+http = requests.Session()
+http.headers.update({"Accept": "application/json"})
 # Open the session with the recorder set to true to enable live.
 with SQLiteConnection(
     db_location, session_identifier, mode="w", recorder=True
@@ -27,12 +30,16 @@ with SQLiteConnection(
     # pandlas would use the column names and app name to write the data to the right
     # channels.
     while True:
-        response = requests.get(WTIA_ENDPOINT, timeout=1)
+        response = http.get(WTIA_ENDPOINT, timeout=1)
         if response.status_code == 200:
             logger.info("Successful request.")
-            df = pd.DataFrame([response.json()])
-            df.index = pd.to_datetime(df.timestamp, unit="s")
-            df.drop(columns=["visibility", "name", "units"], inplace=True)
+            # build the single row directly from the record, without the non-numeric
+            # fields, rather than building a frame and then dropping from it.
+            record = response.json()
+            for key in ("visibility", "name", "units"):
+                record.pop(key, None)
+            timestamp = pd.Timestamp(record["timestamp"], unit="s")
+            df = pd.DataFrame(record, index=pd.DatetimeIndex([timestamp]))
             df.atlas.to_atlas_session(session, show_progress_bar=False)
         else:
             logger.info("Unsuccessful request.")
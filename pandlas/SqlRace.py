@@ -1,79 +1,134 @@
 """Pythonized version of common SQLRace calls"""
 
-import os
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import logging
+import threading
 import pandas as pd
 import numpy as np
-from pandlas.utils import is_port_in_use, timestamp2long
-
-A10_INSTALL_PATH = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10"
-# configure pythonnet runtime for SQLRace API
-os.environ["PYTHONNET_RUNTIME"] = "coreclr"
-os.environ["PYTHONNET_CORECLR_RUNTIME_CONFIG"] = (
-    rf"{A10_INSTALL_PATH}\MAT.Atlas.Host.runtimeconfig.json"
+from pandlas.utils import (
+    get_free_port,
+    is_port_in_use,
+    long2timestamp,
+    timestamp2long,
+)
+from pandlas._dotnet import (
+    add_row_data,
+    dotnet_getattr,
+    enum_to_numpy,
+    to_float32,
+    to_net_array,
+    to_numpy,
+)
+from pandlas._dll_loader import (  # pylint: disable=unused-import
+    A10_INSTALL_PATH,
+    SQL_RACE_DLL_PATH,
+    load_sqlrace,
 )
-
-# only import clr after the runtime has been configured, so pylint: disable=wrong-import-order,wrong-import-position
-import clr
-
 
 logger = logging.getLogger(__name__)
 
-SQL_RACE_DLL_PATH = rf"{A10_INSTALL_PATH}\MESL.SqlRace.Domain.dll"
+# maximum number of samples get_samples requests from .NET at a time
+_SAMPLES_CHUNK_SIZE = 100_000
+# port the server listener is opened on, unless it is in use or another is requested
+_DEFAULT_SERVER_PORT = 7300
 
-# Configure Pythonnet and reference the required assemblies for dotnet and SQL Race
-clr.AddReference("System.Collections")  # pylint: disable=no-member
-clr.AddReference("System.Core")  # pylint: disable=no-member
-clr.AddReference("System.IO")  # pylint: disable=no-member
+_dotnet_imported = False
 
-if not os.path.isfile(SQL_RACE_DLL_PATH):
-    raise FileNotFoundError(
-        "Couldn't find SQL Race DLL at "
-        + SQL_RACE_DLL_PATH
-        + " please check that Atlas 10 is installed"
-    )
 
-clr.AddReference(SQL_RACE_DLL_PATH)
+def _import_dotnet():
+    """Load the SQLRace assemblies and bind the .NET types used in this module.
 
-# .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-from MAT.OCS.Core import (
-    SessionKey,
-)
-
-# .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-from MESL.SqlRace.Domain import (
-    Core,
-    SessionManager,
-    SessionState,
-    RecordersConfiguration,
-    Session,
-    Lap,
-    Marker,
-)
-
-# .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-from System import (
-    DateTime,
-    Guid,
-    Byte,
-    Array,
-)
+    The types are bound as module globals the first time this is called, so importing
+    this module does not require ATLAS to be installed.
+    """
+    # .NET imports, so pylint: disable=global-variable-undefined,import-outside-toplevel,invalid-name,redefined-outer-name
+    global SessionKey, Core, SessionManager, SessionState, RecordersConfiguration
+    global Session, Lap, Marker, DateTime, Guid, Byte, Int64, Array, List
+    global IPEndPoint, IPAddress, DataStatusType, MarkerArray, ByteZero
+    global _HISTORICAL_STATES
+    global _dotnet_imported
+    if _dotnet_imported:
+        return
+    load_sqlrace()
+
+    from MAT.OCS.Core import (
+        SessionKey,
+    )
+    from MESL.SqlRace.Domain import (
+        Core,
+        SessionManager,
+        SessionState,
+        RecordersConfiguration,
+        Session,
+        Lap,
+        Marker,
+    )
+    from System import (
+        DateTime,
+        Guid,
+        Byte,
+        Int64,
+        Array,
+    )
+    from System.Collections.Generic import (
+        List,
+    )
+    from System.Net import (
+        IPEndPoint,
+        IPAddress,
+    )
+    from MESL.SqlRace.Enumerators import (
+        DataStatusType,
+    )
 
-# .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-from System.Collections.Generic import (
-    List,
+    # resolve the generic array type and the constant once, rather than on every call
+    MarkerArray = Array[Marker]
+    ByteZero = Byte(0)
+    # SessionManager.Find only reads the list of states, so it can be shared
+    _HISTORICAL_STATES = List[SessionState]()
+    _HISTORICAL_STATES.Add(SessionState.Historical)
+
+    _dotnet_imported = True
+
+
+# .NET types bound by _import_dotnet that can be imported from this module
+_DOTNET_NAMES = (
+    "SessionKey",
+    "Core",
+    "SessionManager",
+    "SessionState",
+    "RecordersConfiguration",
+    "Session",
+    "Lap",
+    "Marker",
+    "DateTime",
+    "Guid",
+    "Byte",
+    "Int64",
+    "Array",
+    "List",
+    "IPEndPoint",
+    "IPAddress",
+    "DataStatusType",
+    "MarkerArray",
+    "ByteZero",
 )
 
-# .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-from System.Net import (
-    IPEndPoint,
-    IPAddress,
-)
+# load the .NET types on first access, e.g. ``from pandlas.SqlRace import Lap``. Only
+# called for names that are not bound yet, so once _import_dotnet has run the module
+# globals are used directly. Without ATLAS installed, accessing one of them (including
+# with hasattr) raises the loader's error rather than AttributeError.
+__getattr__ = dotnet_getattr(globals(), _import_dotnet, _DOTNET_NAMES)
 
 
 def initialise_sqlrace():
     """Check if SQLRace is initialised and initialise it if not."""
+    _import_dotnet()
     if not Core.IsInitialized:
         logger.info("Initialising SQLRace API.")
         Core.LicenceProgramName = "SQLRace"
@@ -81,17 +136,119 @@ def initialise_sqlrace():
         logger.info("SQLRace API initialised.")
 
 
+@lru_cache(maxsize=256)
+def _parse_key(session_key: str) -> SessionKey:
+    """Parse a session key string, reusing the SessionKey if it was parsed before.
+
+    Args:
+        session_key: String representation of the session key.
+
+    Returns:
+        MAT.OCS.Core.SessionKey object.
+    """
+    _import_dotnet()
+    return SessionKey.Parse(session_key)
+
+
 class SessionConnection(ABC):
     """Abstract class that represents a session connection"""
 
-    initialise_sqlrace()
+    __slots__ = ("client", "session", "sessionKey")
+
     # .NET objects, so pylint: disable=invalid-name
-    sessionManager = SessionManager.CreateSessionManager()
+    sessionManager = None
+    _session_manager_lock = threading.Lock()
+    # (ip address, port) of the server listener, and the connection strings that have
+    # a recorder configured, so they are only set up once per process. Both are
+    # checked and updated under _server_config_lock.
+    _server_endpoint = None
+    _registered_recorders = set()
+    _server_config_lock = threading.Lock()
+
+    @staticmethod
+    def _init_session_manager():
+        """Initialise SQLRace and create the shared SessionManager on first use.
+
+        Connections opened from several threads at once only initialise it once.
+        """
+        if SessionConnection.sessionManager is not None:
+            return
+        with SessionConnection._session_manager_lock:
+            if SessionConnection.sessionManager is None:
+                initialise_sqlrace()
+                SessionConnection.sessionManager = (
+                    SessionManager.CreateSessionManager()
+                )
+
+    @staticmethod
+    def _configure_server(ip_address: str, port: int = None) -> int:
+        """Configures the SQLRace server listener, unless it is already configured.
+
+        The listener is shared by the whole process, so once it is listening on
+        ip_address later recorders reuse it instead of configuring it again. Safe to
+        call from several threads at once.
+
+        Args:
+            ip_address: IP address to open the Server Listener on.
+            port: Port number to open the Server Listener on. If it is in use, a free
+                port picked by the OS is used instead. Leave it as None to reuse the
+                listener that is already configured, or else to use port 7300.
+
+        Returns:
+            The port the Server Listener is on.
+        """
+        with SessionConnection._server_config_lock:
+            configured = SessionConnection._server_endpoint
+            if (
+                configured is not None
+                and configured[0] == ip_address
+                and port in (None, configured[1])
+            ):
+                logger.debug("Server listener already on port %d.", configured[1])
+                return configured[1]
+
+            if port is None:
+                port = _DEFAULT_SERVER_PORT
+            # let the OS pick a free port rather than probing upwards one at a time
+            if is_port_in_use(port, ip_address):
+                port = get_free_port(ip_address)
+            logger.info("Opening server lister on port %d.", port)
+            Core.ConfigureServer(True, IPEndPoint(IPAddress.Parse(ip_address), port))
+            SessionConnection._server_endpoint = (ip_address, port)
+            return port
+
+    @staticmethod
+    def _add_recorder_configuration(
+        database_type: str, name: str, connection_string: str
+    ):
+        """Adds a recorder configuration, unless one was already added for the database.
+
+        Safe to call from several threads at once.
+
+        Args:
+            database_type: "SQLite" or "SQLServer".
+            name: Name and description of the recorder.
+            connection_string: Connection string of the database to record to.
+        """
+        with SessionConnection._server_config_lock:
+            if connection_string in SessionConnection._registered_recorders:
+                logger.debug("Recorder already configured for %s.", connection_string)
+                return
+            # .NET objects, so pylint: disable=invalid-name
+            recorderConfiguration = RecordersConfiguration.GetRecordersConfiguration()
+            recorderConfiguration.AddConfiguration(
+                Guid.NewGuid(),
+                database_type,
+                name,
+                name,
+                connection_string,
+                False,
+            )
+            SessionConnection._registered_recorders.add(connection_string)
 
     @abstractmethod
     def __init__(self):
-        self.client = None
-        raise NotImplementedError
+        """Opens the connection, setting self.client to the SQLRace client session."""
 
     @abstractmethod
     def __enter__(self):
@@ -114,6 +271,15 @@ class SQLiteConnection(SessionConnection):
 
     """
 
+    __slots__ = (
+        "db_location",
+        "session_identifier",
+        "mode",
+        "recorder",
+        "journal_mode",
+        "synchronous",
+    )
+
     def __init__(
         self,
         db_location,
@@ -121,6 +287,8 @@ class SQLiteConnection(SessionConnection):
         session_key: str = None,
         mode="r",
         recorder=False,
+        journal_mode: str = None,
+        synchronous: str = None,
     ):
         """Initializes a connection to a SQLite ATLAS session.
 
@@ -133,17 +301,25 @@ class SQLiteConnection(SessionConnection):
             recorder: Only applies in write mode, set to Ture to configure the SQLRace
                 Server Listener and  Recorder, so it can be viewed as a live session in
                 ATLAS.
+            journal_mode: SQLite journal mode, e.g. "WAL". Leave it as None to use the
+                database default.
+            synchronous: SQLite synchronous setting, e.g. "Normal". Leave it as None to
+                use the database default. "Normal" with WAL avoids a sync on every
+                commit, which speeds up live sessions that write many small batches.
         """
+        self._init_session_manager()
         self.client = None
         self.session = None
         self.db_location = db_location
         self.session_identifier = session_identifier
         self.mode = mode
         self.recorder = recorder
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
 
         if session_key is not None:
             # .NET objects, so pylint: disable=invalid-name
-            self.sessionKey = SessionKey.Parse(session_key)
+            self.sessionKey = _parse_key(session_key)
         else:
             self.sessionKey = None
 
@@ -154,7 +330,14 @@ class SQLiteConnection(SessionConnection):
 
     @property
     def connection_string(self):
-        return f"DbEngine=SQLite;Data Source={self.db_location};Pooling=false;"
+        connection_string = (
+            f"DbEngine=SQLite;Data Source={self.db_location};Pooling=false;"
+        )
+        if self.journal_mode is not None:
+            connection_string += f"Journal Mode={self.journal_mode};"
+        if self.synchronous is not None:
+            connection_string += f"Synchronous={self.synchronous};"
+        return connection_string
 
     def create_sqlite(self):
         if self.recorder:
@@ -177,28 +360,19 @@ class SQLiteConnection(SessionConnection):
         self.session = clientSession.Session
         logger.info("SQLite session created.")
 
-    def start_recorder(self, port=7300):
+    def start_recorder(self, port: int = None):
         """Configures the SQL Server listener and recorder
 
         Args:
-            port: Port number to open the Server Listener on.
+            port: Port number to open the Server Listener on. If it is in use, a free
+                port picked by the OS is used instead. Leave it as None to reuse the
+                listener that is already configured, or else to use port 7300.
 
         """
-        # Find a port that is not in used
-        while is_port_in_use(port):
-            port += 1
-        logger.info("Opening server lister on port %d.", port)
         # Configure server listener
-        Core.ConfigureServer(True, IPEndPoint(IPAddress.Parse("127.0.0.1"), port))
-        # .NET objects, so pylint: disable=invalid-name
-        recorderConfiguration = RecordersConfiguration.GetRecordersConfiguration()
-        recorderConfiguration.AddConfiguration(
-            Guid.NewGuid(),
-            "SQLite",
-            self.db_location,
-            self.db_location,
-            self.connection_string,
-            False,
+        self._configure_server("127.0.0.1", port)
+        self._add_recorder_configuration(
+            "SQLite", self.db_location, self.connection_string
         )
         if self.sessionManager.ServerListener.IsRunning:
             logger.info(
@@ -225,7 +399,7 @@ class SQLiteConnection(SessionConnection):
             None, session is opened and can be accessed from the attribute self.session.
         """
         if session_key is not None:
-            self.sessionKey = SessionKey.Parse(session_key)
+            self.sessionKey = _parse_key(session_key)
         elif self.sessionKey is None:
             raise TypeError(
                 "load_session() missing 1 required positional argument: 'session_key'"
@@ -242,28 +416,35 @@ class SQLiteConnection(SessionConnection):
 class Ssn2Session(SessionConnection):
     """Represents a session connection to a SSN2 file."""
 
+    __slots__ = ("db_location",)
+
     def __init__(self, file_location):
+        self._init_session_manager()
         self.sessionKey = None  # .NET objects, so pylint: disable=invalid-name
         self.client = None
         self.session = None
         self.db_location = file_location
 
     def load_session(self):
-        """Loads the session from the SSN2 file."""
-        connection_string = f"DbEngine=SQLite;Data Source= {self.db_location}"
-        # .NET objects, so pylint: disable=invalid-name
-        stateList = List[SessionState]()
-        stateList.Add(SessionState.Historical)
+        """Loads the session from the SSN2 file.
 
-        # Summary
-        summary = self.sessionManager.Find(connection_string, 1, stateList, False)
-        if summary.Count != 1:
-            logger.warning(
-                "SSN2 contains more than 1 session. Loading session %s. Consider "
-                "using 'SQLiteConnection' instead and specify the session key.",
-                summary.get_Item(0).Identifier,
+        The file is only searched for its session the first time, entering the context
+        again reuses the session key that was found.
+        """
+        connection_string = f"DbEngine=SQLite;Data Source= {self.db_location}"
+        if self.sessionKey is None:
+            # Summary
+            summary = self.sessionManager.Find(
+                connection_string, 1, _HISTORICAL_STATES, False
             )
-        self.sessionKey = summary.get_Item(0).Key
+            first_summary = summary.get_Item(0)
+            if summary.Count != 1:
+                logger.warning(
+                    "SSN2 contains more than 1 session. Loading session %s. Consider "
+                    "using 'SQLiteConnection' instead and specify the session key.",
+                    first_summary.Identifier,
+                )
+            self.sessionKey = first_summary.Key
         self.client = self.sessionManager.Load(self.sessionKey, connection_string)
         self.session = self.client.Session
 
@@ -285,6 +466,15 @@ class SQLRaceDBConnection(SessionConnection):
 
     """
 
+    __slots__ = (
+        "data_source",
+        "database",
+        "session_identifier",
+        "mode",
+        "recorder",
+        "ip_address",
+    )
+
     def __init__(
         self,
         data_source,
@@ -311,6 +501,7 @@ class SQLRaceDBConnection(SessionConnection):
             ip_address: Set by default to the local ip address "127.0.0.1". Modify to
                 make it accessible from other instances.
         """
+        self._init_session_manager()
         self.client = None
         self.session = None
         self.data_source = data_source
@@ -322,7 +513,7 @@ class SQLRaceDBConnection(SessionConnection):
 
         if session_key is not None:
             # .NET objects, so pylint: disable=invalid-name
-            self.sessionKey = SessionKey.Parse(session_key)
+            self.sessionKey = _parse_key(session_key)
         else:
             self.sessionKey = None
 
@@ -359,30 +550,21 @@ class SQLRaceDBConnection(SessionConnection):
         self.session = clientSession.Session
         logger.info("SQLRace Database session created.")
 
-    def start_recorder(self, port=7300):
+    def start_recorder(self, port: int = None):
         """Configures the SQL Server listener and recorder
 
         Args:
-            port: Port number to open the Server Listener on.
+            port: Port number to open the Server Listener on. If it is in use, a free
+                port picked by the OS is used instead. Leave it as None to reuse the
+                listener that is already configured, or else to use port 7300.
 
         """
-        # Find a port that is not in used
-        while is_port_in_use(port):
-            port += 1
-        logger.info("Opening server lister on port %d.", port)
         # Configure server listener
-        Core.ConfigureServer(True, IPEndPoint(IPAddress.Parse(self.ip_address), port))
+        self._configure_server(self.ip_address, port)
         logger.info("Server Listener IPAddress %s.", self.ip_address)
         # Configure recorder
-        # .NET objects, so pylint: disable=invalid-name
-        recorderConfiguration = RecordersConfiguration.GetRecordersConfiguration()
-        recorderConfiguration.AddConfiguration(
-            Guid.NewGuid(),
-            "SQLServer",
-            rf"{self.data_source}\{self.database}",
-            rf"{self.data_source}\{self.database}",
-            self.connection_string,
-            False,
+        self._add_recorder_configuration(
+            "SQLServer", rf"{self.data_source}\{self.database}", self.connection_string
         )
         if self.sessionManager.ServerListener.IsRunning:
             logger.info(
@@ -409,7 +591,7 @@ class SQLRaceDBConnection(SessionConnection):
             session is opened and can be accessed from the attribute self.session.
         """
         if session_key is not None:
-            self.sessionKey = SessionKey.Parse(session_key)
+            self.sessionKey = _parse_key(session_key)
         elif self.sessionKey is None:
             raise TypeError(
                 "load_session() missing 1 required positional argument: 'session_key'"
@@ -424,7 +606,11 @@ class SQLRaceDBConnection(SessionConnection):
 
 
 def get_samples(
-    session, parameter: str, start_time: int = None, end_time: int = None
+    session,
+    parameter: str,
+    start_time: int = None,
+    end_time: int = None,
+    status_filter=None,
 ) -> tuple[np.ndarray, np.ndarray]:
     """Gets all the samples for a parameter in the session
 
@@ -433,19 +619,221 @@ def get_samples(
         parameter: The parameter identifier.
         start_time: Start time to get samples between in int64.
         end_time: End time to get samples between in int64
+        status_filter: Optional DataStatusType, or list of them, to keep. Leave it as
+            None to return every value, whatever its status. Pass
+            DataStatusType.Sample to drop the missing/invalid values.
 
     Returns:
-        tuple of numpy array of samples, timestamps
+        tuple of numpy array of samples, timestamps.
     """
+    _import_dotnet()
     if start_time is None:
         start_time = session.StartTime
     if end_time is None:
         end_time = session.EndTime
     pda = session.CreateParameterDataAccess(parameter)
     sample_count = pda.GetSamplesCount(start_time, end_time)
-    # .NET objects, so pylint: disable=invalid-name
-    ParameterValues = pda.GetSamplesBetween(start_time, end_time, sample_count)
-    return np.array(ParameterValues.Data), np.array(ParameterValues.Timestamp)
+    data = np.empty(sample_count, dtype=np.float64)
+    timestamps = np.empty(sample_count, dtype=np.int64)
+    n_samples = 0
+    # convert the statuses to keep once, rather than for every chunk
+    statuses = None if status_filter is None else _status_values(status_filter)
+    # read in chunks so a long parameter is never held in full on both sides at once.
+    pda.Goto(start_time)
+    remaining = sample_count
+    while remaining > 0:
+        # .NET objects, so pylint: disable=invalid-name
+        ParameterValues = pda.GetNextSamples(min(_SAMPLES_CHUNK_SIZE, remaining))
+        if ParameterValues.Data.Length == 0:
+            break
+        remaining -= ParameterValues.Data.Length
+        if statuses is None:
+            mask = None
+            n_valid = ParameterValues.Data.Length
+        else:
+            # filter on the status in numpy, rather than comparing enums one at a time
+            mask = np.isin(enum_to_numpy(ParameterValues.DataStatus), statuses)
+            n_valid = np.count_nonzero(mask)
+        window = slice(n_samples, n_samples + n_valid)
+        if mask is None or n_valid == len(mask):
+            # usually every sample is valid, then copy straight into the output
+            to_numpy(ParameterValues.Data, np.float64, out=data[window])
+            to_numpy(ParameterValues.Timestamp, np.int64, out=timestamps[window])
+        else:
+            chunk_timestamps = to_numpy(ParameterValues.Timestamp, np.int64)
+            data[window] = to_numpy(ParameterValues.Data, np.float64)[mask]
+            timestamps[window] = chunk_timestamps[mask]
+        n_samples += n_valid
+    return data[:n_samples], timestamps[:n_samples]
+
+
+def _status_values(status_filter) -> np.ndarray:
+    """Integer values of the statuses in status_filter, to compare the samples with.
+
+    Args:
+        status_filter: DataStatusType, or list of them, to keep.
+
+    Returns:
+        numpy array of the integer values of the DataStatusTypes.
+    """
+    if not isinstance(status_filter, (list, tuple, set, frozenset)):
+        status_filter = [status_filter]
+    return np.array([int(s) for s in status_filter])
+
+
+def get_samples_many(
+    session,
+    parameters: list[str],
+    start_time: int = None,
+    end_time: int = None,
+    max_workers: int = 1,
+    status_filter=None,
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Gets all the samples for several parameters in the session
+
+    The parameters are read one after another by default. SQLRace does not document
+    Session as safe to read from several threads at once, so only raise max_workers
+    if concurrent CreateParameterDataAccess and GetNextSamples calls on one Session
+    are known to be safe. pythonnet releases the GIL while in .NET, so the reads then
+    run concurrently.
+
+    Args:
+        session: MESL.SqlRace.Domain.Session object.
+        parameters: The parameter identifiers.
+        start_time: Start time to get samples between in int64.
+        end_time: End time to get samples between in int64
+        max_workers: Maximum number of parameters to read at the same time. Defaults
+            to 1, reading the parameters one after another.
+        status_filter: Optional DataStatusType, or list of them, to keep. See
+            get_samples.
+
+    Returns:
+        dict of parameter identifier to a tuple of numpy array of samples, timestamps.
+    """
+    if max_workers <= 1:
+        return {
+            parameter: get_samples(
+                session, parameter, start_time, end_time, status_filter
+            )
+            for parameter in parameters
+        }
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, max(1, len(parameters)))
+    ) as executor:
+        futures = {
+            parameter: executor.submit(
+                get_samples, session, parameter, start_time, end_time, status_filter
+            )
+            for parameter in parameters
+        }
+        return {parameter: future.result() for parameter, future in futures.items()}
+
+
+async def get_samples_async(
+    session,
+    parameter: str,
+    start_time: int = None,
+    end_time: int = None,
+    status_filter=None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Gets all the samples for a parameter without blocking the event loop
+
+    get_samples runs in the loop's default executor, so the event loop stays free
+    while it reads. Awaiting several of these at once, e.g. with asyncio.gather,
+    reads them on different threads. SQLRace does not document Session as safe to
+    read from several threads at once, so only do that across different sessions, or
+    once concurrent reads of one Session are known to be safe. Otherwise await them
+    one after another.
+
+    Args:
+        session: MESL.SqlRace.Domain.Session object.
+        parameter: The parameter identifier.
+        start_time: Start time to get samples between in int64.
+        end_time: End time to get samples between in int64
+        status_filter: Optional DataStatusType, or list of them, to keep. See
+            get_samples.
+
+    Returns:
+        tuple of numpy array of samples, timestamps.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, get_samples, session, parameter, start_time, end_time, status_filter
+    )
+
+
+def get_samples_series(
+    session,
+    parameter: str,
+    start_date: pd.Timestamp | np.datetime64,
+    start_time: int = None,
+    end_time: int = None,
+    status_filter=None,
+) -> pd.Series:
+    """Gets all the samples for a parameter in the session as a pandas Series
+
+    Args:
+        session: MESL.SqlRace.Domain.Session object.
+        parameter: The parameter identifier.
+        start_date: Date of the session, the timestamps are ns from its midnight.
+        start_time: Start time to get samples between in int64.
+        end_time: End time to get samples between in int64
+        status_filter: Optional DataStatusType, or list of them, to keep. See
+            get_samples.
+
+    Returns:
+        Series of the samples named after the parameter, indexed by their timestamps.
+    """
+    data, timestamps = get_samples(
+        session, parameter, start_time, end_time, status_filter
+    )
+    # long2timestamp allocates the shifted timestamps once and the index wraps that
+    # array without another copy, nor is the data copied into the Series.
+    return pd.Series(
+        data, index=long2timestamp(timestamps, start_date), name=parameter, copy=False
+    )
+
+
+def write_samples(
+    session: Session,
+    channel_ids: list[int],
+    timestamps: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    """Writes samples straight to existing row channels, without building a DataFrame.
+
+    This is meant for appending small batches, e.g. in a live session, to channels
+    that SessionFrame.to_atlas_session has already created. The timestamps are
+    marshalled once and shared by all the channels.
+
+    Args:
+        session: MESL.SqlRace.Domain.Session to write to.
+        channel_ids: IDs of the row channels, one for each column of values.
+        timestamps: int64 ns since midnight of the session date, see timestamp2long.
+        values: Samples of shape (len(timestamps), len(channel_ids)), or 1D if there is
+            a single channel. They should not contain NaNs, as every channel is written
+            at every timestamp.
+
+    Raises:
+        ValueError: The shape of values does not match the timestamps and channels.
+        OverflowError: A value is too large to be stored as a 32-bit float.
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    if values.shape != (len(timestamps), len(channel_ids)):
+        raise ValueError(
+            f"values should have shape ({len(timestamps)}, {len(channel_ids)}), got "
+            f"{values.shape}."
+        )
+    # column-major, so each channel is a contiguous slice
+    values = to_float32(values, order="F")
+    _import_dotnet()
+    timestamps_array = to_net_array(
+        np.ascontiguousarray(timestamps, dtype=np.int64), Int64
+    )
+    for j, channel_id in enumerate(channel_ids):
+        add_row_data(session, channel_id, values[:, j], timestamps_array)
 
 
 def add_lap(
@@ -468,6 +856,7 @@ def add_lap(
     Returns:
         None
     """
+    _import_dotnet()
     if lap_number is None:
         lap_number = session.LapCollection.Count + 1
         logger.debug("No lap number provided, set lap number as %i", lap_number)
@@ -479,7 +868,7 @@ def add_lap(
     newlap = Lap(
         int(timestamp2long(timestamp)),
         lap_number,
-        Byte(0),
+        ByteZero,
         lap_name,
         count_for_fastest_lap,
     )
@@ -500,11 +889,12 @@ def add_point_marker(
     Returns:
         None
     """
+    _import_dotnet()
     marker_time = timestamp2long(marker_time)
     # .NET objects, so pylint: disable=invalid-name
     newPointMarker = Marker(int(marker_time), marker_label)
     # .NET objects, so pylint: disable=invalid-name
-    newMarkers = Array[Marker]([newPointMarker])
+    newMarkers = MarkerArray([newPointMarker])
     session.Markers.Add(newMarkers)
 
 
@@ -525,6 +915,7 @@ def add_range_marker(
     Returns:
         None
     """
+    _import_dotnet()
     marker_start_time = timestamp2long(marker_start_time)
     marker_end_time = timestamp2long(marker_end_time)
     # .NET objects, so pylint: disable=invalid-name
@@ -532,5 +923,116 @@ def add_range_marker(
         int(marker_start_time), int(marker_end_time), marker_label, "MARKER", ""
     )
     # .NET objects, so pylint: disable=invalid-name
-    newMarkers = Array[Marker]([newRangeMarker])
+    newMarkers = MarkerArray([newRangeMarker])
+    session.Markers.Add(newMarkers)
+
+
+def add_laps(
+    session: Session,
+    timestamps: pd.DatetimeIndex,
+    lap_numbers: list[int] = None,
+    lap_names: list[str] = None,
+    count_for_fastest_lap: bool = True,
+) -> None:
+    """Add several laps to the session at once.
+
+    The timestamps are converted in one go, so this is much cheaper than calling
+    add_lap for each lap. They are counted from the midnight of the first timestamp.
+
+    Args:
+        session: MESL.SqlRace.Domain.Session to add the laps to.
+        timestamps: Timestamps to add the laps at.
+        lap_numbers: Lap numbers. Default to count up from
+            `Session.LapCollection.Count + 1`.
+        lap_names: Lap names. Default to be "Lap {lap_number}".
+        count_for_fastest_lap: True if the laps should be considered as part of the
+            fastest lap calculation (e.g. timed laps). Default to be True.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: lap_numbers or lap_names are not the same length as timestamps.
+    """
+    timestamps = pd.DatetimeIndex(timestamps)
+    for name, values in (("lap_numbers", lap_numbers), ("lap_names", lap_names)):
+        if values is not None and len(values) != len(timestamps):
+            raise ValueError(
+                f"{name} should be the same length as timestamps, "
+                f"got {len(values)} and {len(timestamps)}."
+            )
+    _import_dotnet()
+    if len(timestamps) == 0:
+        return
+    if lap_numbers is None:
+        first_lap = session.LapCollection.Count + 1
+        lap_numbers = range(first_lap, first_lap + len(timestamps))
+    if lap_names is None:
+        lap_names = [f"Lap {lap_number}" for lap_number in lap_numbers]
+
+    for timestamp, lap_number, lap_name in zip(
+        timestamp2long(timestamps), lap_numbers, lap_names
+    ):
+        newlap = Lap(
+            int(timestamp), int(lap_number), ByteZero, lap_name, count_for_fastest_lap
+        )
+        session.LapCollection.Add(newlap)
+    logger.info("%i laps added.", len(timestamps))
+
+
+def add_markers(
+    session: Session,
+    marker_times: pd.DatetimeIndex,
+    marker_labels: list[str],
+    marker_end_times: pd.DatetimeIndex = None,
+) -> None:
+    """Adds several markers to the session in a single call.
+
+    Args:
+        session: MESL.SqlRace.Domain.Session to add the markers to.
+        marker_times: Times of the point markers, or start times of the range markers.
+        marker_labels: Labels of the markers.
+        marker_end_times: End times of the range markers. Leave it as None to add point
+            markers.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: marker_labels or marker_end_times are not the same length as
+            marker_times.
+    """
+    marker_times = pd.DatetimeIndex(marker_times)
+    for name, values in (
+        ("marker_labels", marker_labels),
+        ("marker_end_times", marker_end_times),
+    ):
+        if values is not None and len(values) != len(marker_times):
+            raise ValueError(
+                f"{name} should be the same length as marker_times, "
+                f"got {len(values)} and {len(marker_times)}."
+            )
+    _import_dotnet()
+    if len(marker_times) == 0:
+        return
+    start_date = marker_times[0]
+    marker_times = timestamp2long(marker_times)
+    if marker_end_times is None:
+        markers = [
+            Marker(int(marker_time), marker_label)
+            for marker_time, marker_label in zip(marker_times, marker_labels)
+        ]
+    else:
+        marker_end_times = timestamp2long(
+            pd.DatetimeIndex(marker_end_times), start_date=start_date
+        )
+        markers = [
+            Marker(int(start_time), int(end_time), marker_label, "MARKER", "")
+            for start_time, end_time, marker_label in zip(
+                marker_times, marker_end_times, marker_labels
+            )
+        ]
+    # .NET objects, so pylint: disable=invalid-name
+    newMarkers = MarkerArray(markers)
     session.Markers.Add(newMarkers)
+    logger.info("%i markers added.", len(markers))
@@ -4,9 +4,13 @@ An example package demonstrating how to use the SQLRace API. This package is not
 maintained nor officially supported.
 """
 
+import logging
 from importlib.metadata import version
 
 __version__ = version(__package__)
 
+# leave logging configuration to the application
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 from pandlas.session_frame import SessionFrame
 from pandlas.SqlRace import SQLiteConnection, Ssn2Session, SQLRaceDBConnection
@@ -0,0 +1,87 @@
+"""Lazy loading of the ATLAS 10 assemblies through pythonnet
+
+Importing pandlas should not require ATLAS to be installed, so the CLR is only started
+and the SQLRace assemblies referenced the first time a .NET type is actually needed.
+"""
+
+import os
+import logging
+from functools import lru_cache
+
+A10_INSTALL_PATH = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10"
+SQL_RACE_DLL_PATH = rf"{A10_INSTALL_PATH}\MESL.SqlRace.Domain.dll"
+SSN2SPLITER_DLL_PATH = rf"{A10_INSTALL_PATH}\MAT.SqlRace.Ssn2Splitter.dll"
+AUTOMATION_API_DLL_PATH = rf"{A10_INSTALL_PATH}\MAT.Atlas.Automation.Api.dll"
+AUTOMATION_CLIENT_DLL_PATH = rf"{A10_INSTALL_PATH}\MAT.Atlas.Automation.Client.dll"
+
+# configure pythonnet runtime for SQLRace API
+os.environ["PYTHONNET_RUNTIME"] = "coreclr"
+os.environ["PYTHONNET_CORECLR_RUNTIME_CONFIG"] = (
+    rf"{A10_INSTALL_PATH}\MAT.Atlas.Host.runtimeconfig.json"
+)
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def load_sqlrace():
+    """Reference the .NET and SQLRace assemblies if that has not been done already.
+
+    The result is cached, so only the first successful call pays for loading the CLR.
+
+    Raises:
+        FileNotFoundError: One of the ATLAS 10 DLLs could not be found.
+    """
+    # only import clr after the runtime has been configured, so pylint: disable=import-outside-toplevel
+    import clr
+
+    logger.debug("Loading SQLRace assemblies.")
+    # Configure Pythonnet and reference the required assemblies for dotnet and SQL Race
+    clr.AddReference("System.Collections")  # pylint: disable=no-member
+    clr.AddReference("System.Core")  # pylint: disable=no-member
+    clr.AddReference("System.IO")  # pylint: disable=no-member
+
+    if not os.path.isfile(SQL_RACE_DLL_PATH):
+        raise FileNotFoundError(
+            f"Couldn't find SQL Race DLL at {SQL_RACE_DLL_PATH} please check that "
+            f"Atlas 10 is installed."
+        )
+
+    clr.AddReference(SQL_RACE_DLL_PATH)  # pylint: disable=no-member
+
+    if not os.path.isfile(SSN2SPLITER_DLL_PATH):
+        raise FileNotFoundError(
+            f"Couldn't find SSN2 Splitter DLL at {SSN2SPLITER_DLL_PATH}, please check "
+            f"that Atlas 10 is installed."
+        )
+
+    clr.AddReference(SSN2SPLITER_DLL_PATH)  # pylint: disable=no-member
+
+
+@lru_cache(maxsize=1)
+def load_automation():
+    """Reference the Automation API assemblies, and SQLRace, if not done already.
+
+    The result is cached, so the DLLs are only looked up on disk once per process.
+
+    Raises:
+        FileNotFoundError: One of the ATLAS 10 DLLs could not be found.
+    """
+    load_sqlrace()
+    # only import clr after the runtime has been configured, so pylint: disable=import-outside-toplevel
+    import clr
+
+    logger.debug("Loading Automation API assemblies.")
+    if not os.path.isfile(AUTOMATION_API_DLL_PATH):
+        raise FileNotFoundError(
+            f"Couldn't find Automation API DLL at {AUTOMATION_API_DLL_PATH}."
+        )
+
+    clr.AddReference(AUTOMATION_API_DLL_PATH)  # pylint: disable=no-member
+
+    if not os.path.isfile(AUTOMATION_CLIENT_DLL_PATH):
+        raise FileNotFoundError(
+            f"Couldn't find Automation Client DLL at {AUTOMATION_CLIENT_DLL_PATH}."
+        )
+
+    clr.AddReference(AUTOMATION_CLIENT_DLL_PATH)  # pylint: disable=no-member
@@ -0,0 +1,193 @@
+"""Helpers shared by the modules that use the .NET types of SQLRace.
+
+Covers the lazy binding of the .NET types as module globals, the bulk copies of
+arrays between numpy and .NET, and writing float32 row data.
+"""
+
+from __future__ import annotations
+
+import ctypes
+
+import numpy as np
+from pandlas._dll_loader import load_sqlrace
+
+_dotnet_imported = False
+
+
+def _import_dotnet():
+    """Load the SQLRace assemblies and bind the .NET types used in this module."""
+    # .NET imports, so pylint: disable=global-variable-undefined,import-outside-toplevel,invalid-name,redefined-outer-name
+    global Array, Byte, IntPtr, Enum, Marshal, GCHandle, GCHandleType
+    global _dotnet_imported
+    if _dotnet_imported:
+        return
+    load_sqlrace()
+
+    from System import (
+        Array,
+        Byte,
+        IntPtr,
+        Enum,
+    )
+    from System.Runtime.InteropServices import (
+        Marshal,
+        GCHandle,
+        GCHandleType,
+    )
+
+    _dotnet_imported = True
+
+
+def dotnet_getattr(module_globals: dict, import_dotnet, names: tuple[str, ...]):
+    """Creates a module __getattr__ (PEP 562) that loads the .NET types on first access.
+
+    Accessing one of names before import_dotnet has run loads the assemblies, so if
+    ATLAS is not installed it raises the loader's ModuleNotFoundError or
+    FileNotFoundError rather than AttributeError. hasattr() on those names raises too,
+    instead of returning False.
+
+    Args:
+        module_globals: globals() of the module the __getattr__ is for.
+        import_dotnet: Function of that module that binds its .NET types as globals.
+        names: The .NET names import_dotnet binds that the module serves.
+
+    Returns:
+        Function to assign to the module's __getattr__.
+    """
+    names = frozenset(names)
+    module_name = module_globals["__name__"]
+
+    def __getattr__(name):
+        if name in names:
+            import_dotnet()
+            return module_globals[name]
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
+
+
+def to_numpy(net_array: Array, dtype: np.dtype, out: np.ndarray = None) -> np.ndarray:
+    """Copies a .NET array of primitives into a numpy array with a single memcpy.
+
+    Iterating a .NET array from Python converts it one element at a time across the
+    pythonnet boundary, so copy the underlying memory in bulk instead.
+
+    Args:
+        net_array: .NET array of a primitive type, e.g. Double[] or Int64[].
+        dtype: numpy dtype matching the element type of net_array.
+        out: Optional C-contiguous array of dtype and the same length as net_array to
+            copy into, instead of allocating a new one.
+
+    Returns:
+        numpy array holding a copy of net_array.
+    """
+    _import_dotnet()
+    values = np.empty(net_array.Length, dtype=dtype) if out is None else out
+    if len(values) > 0:
+        Marshal.Copy(net_array, 0, IntPtr(values.ctypes.data), len(values))
+    return values
+
+
+def enum_to_numpy(net_array: Array) -> np.ndarray:
+    """Copies a .NET array of enums into a new numpy array of their integer values.
+
+    Marshal.Copy has no overload for enum arrays, so the array is pinned and its memory
+    read directly instead.
+
+    Args:
+        net_array: .NET array of an enum type, e.g. DataStatusType[].
+
+    Returns:
+        numpy array of signed integers the size of the enum's underlying type.
+    """
+    _import_dotnet()
+    underlying_type = Enum.GetUnderlyingType(net_array.GetType().GetElementType())
+    dtype = np.dtype(f"i{Marshal.SizeOf(underlying_type)}")
+    if net_array.Length == 0:
+        return np.empty(0, dtype=dtype)
+    handle = GCHandle.Alloc(net_array, GCHandleType.Pinned)
+    try:
+        buffer = (ctypes.c_byte * (net_array.Length * dtype.itemsize)).from_address(
+            handle.AddrOfPinnedObject().ToInt64()
+        )
+        return np.frombuffer(buffer, dtype=dtype).copy()
+    finally:
+        handle.Free()
+
+
+def to_net_array(values: np.ndarray, net_type) -> Array:
+    """Copies a contiguous numpy array into a new .NET array with a single memcpy.
+
+    Args:
+        values: C-contiguous 1D numpy array whose dtype matches net_type.
+        net_type: .NET element type of the array to create, e.g. Int64 or Byte.
+
+    Returns:
+        .NET array of net_type holding a copy of values.
+    """
+    _import_dotnet()
+    net_array = Array[net_type](len(values))
+    if len(values) > 0:
+        Marshal.Copy(IntPtr(values.ctypes.data), net_array, 0, len(values))
+    return net_array
+
+
+def add_row_data(session, channel_id: int, data: np.ndarray, timestamps_array: Array):
+    """Adds data to a row channel, with the timestamps already marshalled to .NET.
+
+    data is only converted if it is not already contiguous float32, so the common
+    float64 column costs a single cast and no intermediate Python objects.
+
+    Args:
+        session: MESL.SqlRace.Domain.Session to add data to.
+        channel_id: ID of the channel.
+        data: numpy array of float or float equivalents, without NaNs.
+        timestamps_array: .NET Int64[] of the timestamps for the datapoints. It is not
+            modified, so it can be shared between channels.
+    """
+    _import_dotnet()
+    databytes = to_net_array(
+        np.ascontiguousarray(data, dtype=np.float32).view(np.uint8), Byte
+    )
+    session.AddRowData(channel_id, timestamps_array, databytes, 4, False)
+
+
+def to_float32(values: np.ndarray, order: str = "K") -> np.ndarray:
+    """Casts values to float32, the type the row channels are stored in.
+
+    Args:
+        values: numpy array of float or float equivalents.
+        order: Memory layout of the result, as for np.ndarray.astype.
+
+    Returns:
+        values as float32, not copied if they already are.
+
+    Raises:
+        OverflowError: A value is too large to be stored as a 32-bit float.
+    """
+    values = np.asarray(values)
+    with np.errstate(over="ignore"):
+        cast = values.astype(np.float32, order=order, copy=False)
+    if values.dtype != np.float32 and np.isinf(cast).any():
+        check_float32_overflow(cast, values)
+    return cast
+
+
+def check_float32_overflow(values: np.ndarray, source: np.ndarray):
+    """Raises OverflowError if a finite value became infinite when cast to float32.
+
+    The cast turns values beyond about ±3.4e38 into ±inf rather than failing, so this
+    tells those apart from infinities that were already in source.
+
+    Args:
+        values: float32 array cast from source.
+        source: The values before the cast, of the same shape.
+
+    Raises:
+        OverflowError: A finite value in source is beyond the range of float32.
+    """
+    overflow = np.isinf(values) & np.isfinite(source)
+    if overflow.any():
+        raise OverflowError(
+            f"{source[overflow][0]} is too large to be stored as a 32-bit float."
+        )
@@ -5,81 +5,169 @@ See Also
 """
 from typing import List
 
-import clr
+import logging
 import subprocess
 import threading
-import os
+import time
+
+from pandlas._dotnet import dotnet_getattr
+from pandlas._dll_loader import (
+    AUTOMATION_API_DLL_PATH,
+    AUTOMATION_CLIENT_DLL_PATH,
+    SQL_RACE_DLL_PATH,
+    SSN2SPLITER_DLL_PATH,
+    load_automation,
+)
 
 # The path to the main SQL Race DLL. This is the default location when installed with Atlas 10
-sql_race_dll_path = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10\MESL.SqlRace.Domain.dll"
-ssn2splitter_dll_path = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10\MAT.SqlRace.Ssn2Splitter.dll"
+sql_race_dll_path = SQL_RACE_DLL_PATH
+ssn2splitter_dll_path = SSN2SPLITER_DLL_PATH
 # The paths to Automation API DLL files.
-automation_api_dll_path = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10\MAT.Atlas.Automation.Api.dll"
-automation_client_dll_path = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10\MAT.Atlas.Automation.Client.dll"
-
-# Configure Pythonnet and reference the required assemblies for dotnet and SQL Race
-clr.AddReference("System.Collections")
-clr.AddReference("System.Core")
-clr.AddReference("System.IO")
-
-if not os.path.isfile(sql_race_dll_path):
-    raise Exception("Couldn't find SQL Race DLL at " + sql_race_dll_path + " please check that Atlas 10 is installed")
-
-clr.AddReference(sql_race_dll_path)
-
-if not os.path.isfile(automation_api_dll_path):
-    raise Exception(f"Couldn't find Automation API DLL at {automation_api_dll_path}.")
-
-clr.AddReference(automation_api_dll_path)
-
-if not os.path.isfile(automation_client_dll_path):
-    raise Exception(f"Couldn't find Automation Client DLL at {automation_client_dll_path}.")
-clr.AddReference(automation_client_dll_path)
-
-from MAT.Atlas.Automation.Client.Services import ApplicationServiceClient, WorkbookServiceClient, SetServiceClient
-from MAT.Atlas.Automation.Api.Models import *
-from System.IO import Path
-from System import AppDomain
-
-
-def open_atlas(app):
+automation_api_dll_path = AUTOMATION_API_DLL_PATH
+automation_client_dll_path = AUTOMATION_CLIENT_DLL_PATH
+
+logger = logging.getLogger(__name__)
+
+_dotnet_imported = False
+
+
+def _import_dotnet():
+    """Load the SQLRace and Automation API assemblies and bind the .NET types used here.
+
+    The types are bound as module globals the first time this is called, so importing
+    this module does not start the CLR.
+    """
+    # .NET imports, so pylint: disable=global-variable-undefined,import-outside-toplevel,invalid-name,redefined-outer-name
+    global ApplicationServiceClient, WorkbookServiceClient, SetServiceClient
+    global SessionLoaded, Path, AppDomain, _dotnet_imported
+    if _dotnet_imported:
+        return
+    load_automation()
+
+    from MAT.Atlas.Automation.Client.Services import (
+        ApplicationServiceClient,
+        WorkbookServiceClient,
+        SetServiceClient,
+    )
+    from MAT.Atlas.Automation.Api.Models import SessionLoaded
+    from System.IO import Path
+    from System import AppDomain
+
+    _dotnet_imported = True
+
+
+# .NET types bound by _import_dotnet that can be imported from this module
+_DOTNET_NAMES = (
+    "ApplicationServiceClient",
+    "WorkbookServiceClient",
+    "SetServiceClient",
+    "SessionLoaded",
+    "Path",
+    "AppDomain",
+)
+
+# load the .NET types on first access, e.g. ``ApplicationServiceClient``. Without
+# ATLAS installed, accessing one of them (including with hasattr) raises the loader's
+# error rather than AttributeError.
+__getattr__ = dotnet_getattr(globals(), _import_dotnet, _DOTNET_NAMES)
+
+
+def open_atlas(app, timeout: float = None):
+    """Opens ATLAS 10 and connects the automation client to it.
+
+    Instead of waiting a fixed time for ATLAS to start, the connection is retried with
+    a growing delay until ATLAS accepts it.
+
+    Args:
+        app: ApplicationServiceClient to connect.
+        timeout: Seconds to wait for ATLAS to open and the client to connect. Leave it
+            as None to wait indefinitely.
+
+    Raises:
+        TimeoutError: The client did not connect within timeout.
+    """
+    _import_dotnet()
     # Open ATLAS10 from default installation location
     subprocess.Popen(r"C:\Program Files\McLaren Applied Technologies\ATLAS 10\MAT.ATLAS.Host.exe")
-    print("Waiting for ATLAS to open")
+    logger.info("Waiting for ATLAS to open.")
+    deadline = None if timeout is None else time.monotonic() + timeout
 
-    import time
-    time.sleep(10)
-    # set up multiprocessing.Lock to be used to block until client is connected.
-    connect = threading.Lock()
-    connect.acquire()
+    # set by the event handler once the client is connected
+    connected = threading.Event()
 
     def client_connected(client_name):
         # event handler for OnClientConnected
-        print('\nATLAS Client connected.')
-        print(f'ATLAS version: {app.GetVersion()}')
-        connect.release()
+        logger.info("ATLAS client connected.")
+        logger.info("ATLAS version: %s.", app.GetVersion())
+        connected.set()
 
     app.OnClientConnected += client_connected
-    app.Connect(Path.GetFileNameWithoutExtension(AppDomain.CurrentDomain.FriendlyName))
-    # Wait until client is connected. The next line cannot run until connect is released by the handeler function.
-    connect.acquire()
-    connect.release()
-
-
-def load_session(app, setid, keys: List[str], connection_string: List[str]):
-    load = threading.Lock()
-    load.acquire()
+    try:
+        client_name = Path.GetFileNameWithoutExtension(AppDomain.CurrentDomain.FriendlyName)
+        delay = 0.5
+        while True:
+            try:
+                app.Connect(client_name)
+                break
+            except Exception:  # ATLAS is not listening yet, so pylint: disable=broad-except
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 5)
+        # Wait until client is connected, the event is set by the handler function.
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if not connected.wait(remaining):
+            raise TimeoutError(f"ATLAS client did not connect within {timeout}s.")
+    finally:
+        # unsubscribe, so repeated calls do not pile up handlers on the client
+        app.OnClientConnected -= client_connected
+
+
+def load_session(
+    app, setid, keys: List[str], connection_string: List[str], timeout: float = None
+):
+    """Loads SQLRace sessions into a set in ATLAS and waits for all of them to load.
+
+    All the sessions are requested in a single call, then this waits until
+    OnSessionLoaded has fired once for each key.
+
+    Args:
+        app: Connected ApplicationServiceClient.
+        setid: Identifier of the set to load the sessions into.
+        keys: Session keys of the sessions to load.
+        connection_string: Connection strings of the databases the sessions are in.
+        timeout: Seconds to wait for the sessions to load. Leave it as None to wait
+            indefinitely.
+
+    Raises:
+        TimeoutError: The sessions did not all load within timeout.
+    """
+    _import_dotnet()
+    # set by the event handler once every session is loaded
+    loaded = threading.Event()
+    pending = len(keys)
+    pending_lock = threading.Lock()
+    if pending == 0:
+        loaded.set()
 
     def session_loaded(session_loaded:SessionLoaded):
         # event handeler for OnSessionLoaded
-        print('Session loaded.')
-        load.release()
+        nonlocal pending
+        logger.info("Session loaded.")
+        with pending_lock:
+            pending -= 1
+            if pending <= 0:
+                loaded.set()
 
     app.OnSessionLoaded += session_loaded
-    # Loading session from SQL Race into specified set, using session keys found in SQLRace API and connection string to SQL Race
-    print('\nLoading session...')
-    app.LoadSqlRaceSessions(setid, keys, connection_string)
-    # wait for session to load
-    load.acquire()
-    load.release()
-
+    try:
+        # Loading session from SQL Race into specified set, using session keys found in SQLRace API and connection string to SQL Race
+        logger.info("Loading %d sessions.", len(keys))
+        app.LoadSqlRaceSessions(setid, keys, connection_string)
+        # wait for all the sessions to load
+        if not loaded.wait(timeout):
+            raise TimeoutError(
+                f"{pending} of {len(keys)} sessions did not load within {timeout}s."
+            )
+    finally:
+        app.OnSessionLoaded -= session_loaded
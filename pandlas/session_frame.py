@@ -15,80 +15,93 @@ See Also:
         https://github.com/mat-docs
 
 """
-import os
-import random
+from __future__ import annotations
+
+import hashlib
+import secrets
 import warnings
-import struct
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from typing import Union
 import logging
 import numpy.typing as npt
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from pandlas.utils import timestamp2long
-
-A10_INSTALL_PATH = r"C:\Program Files\McLaren Applied Technologies\ATLAS 10"
-# configure pythonnet runtime for SQLRace API
-os.environ["PYTHONNET_RUNTIME"] = "coreclr"
-os.environ["PYTHONNET_CORECLR_RUNTIME_CONFIG"] = (
-    rf"{A10_INSTALL_PATH}\MAT.Atlas.Host.runtimeconfig.json"
+from pandlas.utils import timestamp2long, timestamp2long_array
+from pandlas._dotnet import (
+    add_row_data,
+    check_float32_overflow,
+    to_float32,
+    to_net_array,
+)
+from pandlas._dll_loader import (  # pylint: disable=unused-import
+    A10_INSTALL_PATH,
+    SQL_RACE_DLL_PATH,
+    SSN2SPLITER_DLL_PATH,
+    load_sqlrace,
 )
-# only import clr after the runtime has been configured, so pylint: disable=wrong-import-position
-import clr
 
 logger = logging.getLogger(__name__)
 
-SQL_RACE_DLL_PATH = rf"{A10_INSTALL_PATH}\MESL.SqlRace.Domain.dll"
-SSN2SPLITER_DLL_PATH = rf"{A10_INSTALL_PATH}\MAT.SqlRace.Ssn2Splitter.dll"
+# minimum seconds between progress bar refreshes, wide frames have thousands of columns
+_PROGRESS_BAR_INTERVAL = 0.5
+# maximum number of samples add_data sends to .NET in a single AddRowData call
+_ROW_DATA_CHUNK_SIZE = 1_000_000
 
-# Configure Pythonnet and reference the required assemblies for dotnet and SQL Race
-clr.AddReference("System.Collections")  # pylint: disable=no-member
-clr.AddReference("System.Core")  # pylint: disable=no-member
-clr.AddReference("System.IO")  # pylint: disable=no-member
+_dotnet_imported = False
 
-if not os.path.isfile(SQL_RACE_DLL_PATH):
-    raise FileNotFoundError(
-        f"Couldn't find SQL Race DLL at {SQL_RACE_DLL_PATH} please check that Atlas 10 "
-        f"is installed."
-    )
 
-clr.AddReference(SQL_RACE_DLL_PATH)  # pylint: disable=no-member
+def _import_dotnet():
+    """Load the SQLRace assemblies and bind the .NET types used in this module.
 
-if not os.path.isfile(SSN2SPLITER_DLL_PATH):
-    raise FileNotFoundError(
-        f"Couldn't find SSN2 Splitter DLL at {SSN2SPLITER_DLL_PATH}, please check that "
-        f"Atlas 10 is installed."
+    The types are bound as module globals the first time this is called, so the
+    accessor can be registered without ATLAS being installed.
+    """
+    # .NET imports, so pylint: disable=global-variable-undefined,import-outside-toplevel,invalid-name,redefined-outer-name
+    global NETList, Byte, String, UInt32, Int64, Session, Lap
+    global ConfigurationSetManager, ParameterGroup, ApplicationGroup
+    global RationalConversion, ConfigurationSetAlreadyExistsException
+    global ConfigurationSet, Parameter, Channel, DataType, ChannelDataSourceType
+    global ByteZero, _dotnet_imported
+    if _dotnet_imported:
+        return
+    load_sqlrace()
+
+    from System.Collections.Generic import (
+        List as NETList,
+    )
+    from System import (
+        Byte,
+        String,
+        UInt32,
+        Int64,
+    )
+    from MESL.SqlRace.Domain import (
+        Session,
+        Lap,
+        ConfigurationSetManager,
+        ParameterGroup,
+        ApplicationGroup,
+        RationalConversion,
+        ConfigurationSetAlreadyExistsException,
+        ConfigurationSet,
+        Parameter,
+        Channel,
+    )
+    from MESL.SqlRace.Enumerators import (
+        DataType,
+        ChannelDataSourceType,
     )
 
-clr.AddReference(SSN2SPLITER_DLL_PATH)  # pylint: disable=no-member
-
-from System.Collections.Generic import (  # .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-    List as NETList,
-)
+    # construct the constant once, rather than for every lap
+    ByteZero = Byte(0)
 
-from System import (  # .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-    Byte,
-    String,
-    UInt32,
-    Array,
-    Int64,
-)
-from MESL.SqlRace.Domain import (  # .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-    Session,
-    Lap,
-    ConfigurationSetManager,
-    ParameterGroup,
-    ApplicationGroup,
-    RationalConversion,
-    ConfigurationSetAlreadyExistsException,
-    ConfigurationSet,
-    Parameter,
-    Channel,
-)
-from MESL.SqlRace.Enumerators import (  # .NET imports, so pylint: disable=wrong-import-position,wrong-import-order,import-error,wildcard-import
-    DataType,
-    ChannelDataSourceType,
-)
+    _dotnet_imported = True
 
 
 @pd.api.extensions.register_dataframe_accessor("atlas")
@@ -100,6 +113,16 @@ class SessionFrame:
         ParameterGroupIdentifier: Parameter Group Identifier
     """
 
+    __slots__ = (
+        "_obj",
+        "ParameterGroupIdentifier",
+        "ApplicationGroupName",
+        "paramchannelID",
+        "units",
+        "descriptions",
+        "display_format",
+    )
+
     def __init__(self, pandas_obj):
         self._obj = pandas_obj
         self.ParameterGroupIdentifier = (  # .NET objects, so pylint: disable=invalid-name
@@ -115,7 +138,13 @@ class SessionFrame:
             {}
         )  # TODO: move to setter method and check for datatype and format
 
-    def to_atlas_session(self, session: Session, show_progress_bar: bool = True):
+    def to_atlas_session(
+        self,
+        session: Session,
+        show_progress_bar: bool = True,
+        *,
+        max_workers: int = None,
+    ):
         """Add the contents of the DataFrame to the ATLAS session.
 
         The index of the DataFrame must be a DatetimeIndex, or else a AttributeError
@@ -126,16 +155,16 @@ class SessionFrame:
         If there is a parameter with the same name and app group present in the session,
         it will just add to that existing channel.
 
-        When creating new parameters in the config, Pandlas will utilise df.atlas.unit
+        When creating new parameters in the config, Pandlas will utilise df.atlas.units
         attribute to set the parameter unit. This should be provided in the form of a
         dictionary, where the keys are the parameter identifiers and the values are the
         units, both in string.
         If none have been provided, a default value of no unit "" will be set.
 
         When creating new parameters in the config, Pandlas will utilise
-        df.atlas.description attribute to set the parameter description. This should be
-        provided in the form of a dictionary, where the keys are the parameter
-        identifiers and the values are the units, both in string.
+        df.atlas.descriptions attribute to set the parameter description. This should
+        be provided in the form of a dictionary, where the keys are the parameter
+        identifiers and the values are the descriptions, both in string.
         If none have been provided, a default value of f"{parameter_name} description"
         will be set.
 
@@ -149,9 +178,13 @@ class SessionFrame:
         Args:
             session: MESL.SqlRace.Domain.Session to the data to.
             show_progress_bar: Show progress bar when creating config and adding data.
+            max_workers: Maximum number of channels to write at the same time. Defaults
+                to 1, writing the channels one after another.
         Raises:
              AttributeError: The index is not a pd.DatetimeIndex.
+             OverflowError: A value is too large to be stored as a 32-bit float.
         """
+        _import_dotnet()
 
         if not isinstance(self._obj.index, pd.DatetimeIndex):
             warnings.warn(
@@ -159,43 +192,76 @@ class SessionFrame:
                 "DatetimeIndex."
             )
             try:
-                self._obj.index = pd.to_datetime(self._obj.index)
-                warnings.warn("parse success.")
-            except pd.errors.ParserError:
-                warnings.warn("parse failed.")
-
-        if not isinstance(self._obj.index, pd.DatetimeIndex):
-            raise AttributeError(
-                "DataFrame index is not pd.DatetimeIndex, unable to export to ssn2"
+                index = pd.to_datetime(self._obj.index)
+            except ValueError as exc:  # includes pd.errors.ParserError
+                raise AttributeError(
+                    "DataFrame index is not pd.DatetimeIndex, unable to export to ssn2"
+                ) from exc
+            if not isinstance(index, pd.DatetimeIndex):
+                raise AttributeError(
+                    "DataFrame index is not pd.DatetimeIndex, unable to export to ssn2"
+                )
+            self._obj.index = index
+
+        # sort by time, only copying the frame when it is not sorted already.
+        if not self._obj.index.is_monotonic_increasing:
+            self._obj = self._obj.sort_index()
+
+        # materialise the frame as a single block, so the columns are accessed by
+        # position rather than through the label indexer each pass. The channels are
+        # stored as 32-bit floats, so cast the whole frame once here. Column-major, so
+        # each column is contiguous and is copied straight into .NET without a temp.
+        with np.errstate(over="ignore"):
+            values = np.asfortranarray(
+                self._obj.to_numpy(dtype=np.float32, na_value=np.nan)
             )
-
-        # remove rows that contain no data at all and sort by time.
-        self._obj = self._obj.dropna(axis=1, how="all").sort_index()
+        # the cast turns values too large for float32 into inf, so only when there
+        # are any, look at the original values to tell them from genuine infs.
+        if np.isinf(values).any():
+            check_float32_overflow(
+                values, self._obj.to_numpy(dtype=np.float64, na_value=np.nan)
+            )
+        # remove columns that contain no data at all, on the array rather than by
+        # copying the frame with dropna.
+        has_data = ~np.isnan(values).all(axis=0)
+        columns = [name for name, keep in zip(self._obj.columns, has_data) if keep]
+        if not has_data.all():
+            values = np.asfortranarray(values[:, has_data])
+        if not columns or len(values) == 0:
+            logger.info("DataFrame has no data, nothing to add to the session.")
+            return
 
         # add a lap at the start of the session
         # TODO: add the rest of the laps
-        timestamp = self._obj.index[0]
-        timestamp64 = timestamp2long(timestamp)
-        try:
-            lap = self._obj.loc[timestamp].Lap
-        except AttributeError:
-            lap = 1
-        newlap = Lap(int(timestamp64), int(lap), Byte(0), f"Lap {lap}", True)
         # TODO: what to do when you add to an existing session.
         if session.LapCollection.Count == 0:
+            timestamp = self._obj.index[0]
+            timestamp64 = timestamp2long(timestamp)
+            if "Lap" in columns:
+                lap = self._obj.iat[0, self._obj.columns.get_loc("Lap")]
+            else:
+                lap = 1
+            newlap = Lap(int(timestamp64), int(lap), ByteZero, f"Lap {lap}", True)
             logger.debug("No lap present, automatically adding lap to the start.")
             session.LapCollection.Add(newlap)
 
-        # check if there is config for it already
-        need_new_config = False
-        for param_name in self._obj.columns:
-            param_identifier = f"{param_name}:{self.ApplicationGroupName}"
-            if not session.ContainsParameter(param_identifier):
-                need_new_config = True
-
-        if need_new_config:
+        # check if there is config for it already, only asking the session once for
+        # each parameter.
+        existing_params = {
+            param_name
+            for param_name in columns
+            if session.ContainsParameter(f"{param_name}:{self.ApplicationGroupName}")
+        }
+        new_params = [
+            (j, param_name)
+            for j, param_name in enumerate(columns)
+            if param_name not in existing_params
+        ]
+        logger.debug("Parameters already in the session: %s.", existing_params)
+
+        if new_params:
             logger.debug("Creating new config.")
-            config_identifier = f"{random.randint(0, 999999):05x}"  # .NET objects, so pylint: disable=invalid-name
+            config_identifier = secrets.token_hex(6)
             config_decription = "SessionFrame generated config"
             configSetManager = (  # .NET objects, so pylint: disable=invalid-name
                 ConfigurationSetManager.CreateConfigurationSetManager()
@@ -229,13 +295,6 @@ class SessionFrame:
             applicationGroup.SupportsRda = False
             config.AddGroup(applicationGroup)
 
-            parameterGroupIdentifier = (  # .NET objects, so pylint: disable=invalid-name
-                self.ParameterGroupIdentifier
-            )
-            applicationGroupName = (  # .NET objects, so pylint: disable=invalid-name
-                self.ApplicationGroupName
-            )
-
             # Create channel conversion function
             conversion_function_name = "Simple1To1"
             config.AddConversion(
@@ -244,23 +303,16 @@ class SessionFrame:
                 )
             )
 
-            # obtain the data
-            for param_name in tqdm(
-                self._obj.columns,
-                desc="Creating channels",
-                disable=not show_progress_bar,
+            # obtain the display limits of every column in one pass over the block.
+            # All-NaN columns have been dropped, so the limits are never NaN.
+            display_max = np.nanmax(values, axis=0)
+            display_min = np.nanmin(values, axis=0)
+            # only create parameters that do not exist already
+            for j, param_name in _progress(
+                new_params, show_progress_bar, desc="Creating channels"
             ):
-                param_identifier = f"{param_name}:{self.ApplicationGroupName}"
-                # if parameter exists already, then do not create a new parameter
-                if session.ContainsParameter(param_identifier):
-                    logger.debug(
-                        "Parameter identifier already exists: %s.", {param_identifier}
-                    )
-                    continue
-
-                data = self._obj.loc[:, param_name].dropna().to_numpy()
-                dispmax = data.max()
-                dispmin = data.min()
+                dispmax = float(display_max[j])
+                dispmin = float(display_min[j])
                 warnmax = dispmax
                 warnmin = dispmin
 
@@ -270,17 +322,19 @@ class SessionFrame:
                 )
                 # TODO: this is a stupid workaround because it takes UInt32 but it cast
                 #  it to Int32 internally...
-                self._add_channel(config, myParamChannelId, param_name)
+                self._add_channel(config, myParamChannelId)
+                self.paramchannelID[param_name] = myParamChannelId
 
                 #  Add param
                 self._add_param(
                     config,
                     applicationGroupName,
                     conversion_function_name,
-                    parameterGroupIdentifier,
+                    parameterGroupIds,
                     dispmax,
                     dispmin,
                     param_name,
+                    myParamChannelId,
                     warnmax,
                     warnmin,
                 )
@@ -293,10 +347,10 @@ class SessionFrame:
                 )
             session.UseLoggingConfigurationSet(config.Identifier)
 
-        # Obtain the channel Id for the existing parameters
-        for param_name in self._obj.columns:
-            param_identifier = f"{param_name}:{self.ApplicationGroupName}"
-            if not session.ContainsParameter(param_identifier):
+        # Obtain the channel Id for the existing parameters, the new ones were recorded
+        # when their channels were created.
+        for param_name in columns:
+            if param_name not in existing_params:
                 continue
             param_identifier = f"{param_name}:{self.ApplicationGroupName}"
             parameter = session.GetParameter(param_identifier)
@@ -306,19 +360,63 @@ class SessionFrame:
                 )
             self.paramchannelID[param_name] = parameter.Channels[0].Id
 
-        # write it to the session
-        for param_name in tqdm(
-            self._obj.columns, desc="Adding data", disable=not show_progress_bar
-        ):
-            series = self._obj.loc[:, param_name].dropna()
-            timestamps = series.index
-            data = series.to_numpy()
-            myParamChannelId = (    # .NET objects, so pylint: disable=invalid-name
-                self.paramchannelID[
-                    param_name
-                ]
-            )
-            self.add_data(session, myParamChannelId, data, timestamps)
+        # write it to the session. Columns with the same gaps (e.g. all the columns
+        # without any) share their timestamps, so they are written one after another
+        # and their timestamps are only marshalled to .NET once. Only the digest of
+        # each mask is kept, and the timestamps of one group at a time.
+        timestamps = timestamp2long_array(self._obj.index)
+        groups = {}
+        for j in range(len(columns)):
+            mask_key = hashlib.blake2b(
+                np.packbits(~np.isnan(values[:, j])).tobytes(), digest_size=16
+            ).digest()
+            groups.setdefault(mask_key, []).append(j)
+
+        def channel_writes():
+            """Yields the channel id, data and .NET timestamps of each column."""
+            for group in groups.values():
+                valid = ~np.isnan(values[:, group[0]])
+                all_valid = valid.all()
+                timestamps_array = to_net_array(
+                    timestamps if all_valid else timestamps[valid], Int64
+                )
+                for j in group:
+                    data = values[:, j] if all_valid else values[valid, j]
+                    yield self.paramchannelID[columns[j]], data, timestamps_array
+                del timestamps_array
+
+        writes = _progress(
+            channel_writes(), show_progress_bar, total=len(columns), desc="Adding data"
+        )
+        # Writes are serial by default: SQLRace does not document Session as safe for
+        # concurrent AddRowData calls. Raising max_workers is only safe once it does,
+        # i.e. it guarantees that writes to different channels of one Session may run
+        # on different threads at the same time. Each worker only writes to its own
+        # channel, and pythonnet releases the GIL while in .NET.
+        if max_workers is None or max_workers <= 1:
+            for channel_id, data, timestamps_array in writes:
+                add_row_data(session, channel_id, data, timestamps_array)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = set()
+                for channel_id, data, timestamps_array in writes:
+                    # only marshal the next channel once a worker is free for it, so
+                    # at most max_workers channels are held in .NET at a time.
+                    if len(pending) >= max_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(
+                        executor.submit(
+                            add_row_data,
+                            session,
+                            channel_id,
+                            data,
+                            timestamps_array,
+                        )
+                    )
+                for future in as_completed(pending):
+                    future.result()
 
         logger.debug(
             "Data for %s:%s added.",
@@ -331,10 +429,11 @@ class SessionFrame:
         config: ConfigurationSet,
         ApplicationGroupName: str,  # .NET objects, so pylint: disable=invalid-name
         ConversionFunctionName: str,  # .NET objects, so pylint: disable=invalid-name
-        ParameterGroupIdentifier: str,  # .NET objects, so pylint: disable=invalid-name
+        parameter_group_ids: NETList,
         display_max: float,
         display_min: float,
         parameter_name: str,
+        channel_id: int,
         warning_max: float,
         warning_min: float,
     ):
@@ -344,25 +443,21 @@ class SessionFrame:
             config: ConfigurationSet to add to.
             ApplicationGroupName: Name of the ApplicationGroup to be under
             ConversionFunctionName: Name of the conversion factor to apply.
-            ParameterGroupIdentifier: ID of the ParameterGroup.
+            parameter_group_ids: List[String] of the ParameterGroup IDs. This is shared
+                between all parameters in the config, so it is not modified.
             display_max: Display maximum.
             display_min: Display minimum.
             parameter_name: Parameter name.
+            channel_id: ID of the channel holding the parameter data.
             warning_max: Warning maximum.
             warning_min: Warning minimum.
 
         """
-        # TODO: guard again NaNs
         myParamChannelId = NETList[  # .NET objects, so pylint: disable=invalid-name
             UInt32
         ]()
-        myParamChannelId.Add(self.paramchannelID[parameter_name])
+        myParamChannelId.Add(channel_id)
         parameterIdentifier = f"{parameter_name}:{ApplicationGroupName}"  # .NET objects, so pylint: disable=invalid-name
-        parameterGroupIdentifiers = NETList[  # .NET objects, so pylint: disable=invalid-name
-            String
-        ]()
-        parameterGroupIdentifiers.Add(ParameterGroupIdentifier)
-
         param_description = self.descriptions.get(
             parameterIdentifier, f"{parameter_name} description"
         )
@@ -381,7 +476,7 @@ class SessionFrame:
             0xFFFF,
             0,
             ConversionFunctionName,
-            parameterGroupIdentifiers,
+            parameter_group_ids,
             myParamChannelId,
             ApplicationGroupName,
             param_format,
@@ -389,17 +484,14 @@ class SessionFrame:
         )
         config.AddParameter(myParameter)
 
-    def _add_channel(
-        self, config: ConfigurationSet, channel_id: int, parameter_name: str
-    ):
+    @staticmethod
+    def _add_channel(config: ConfigurationSet, channel_id: int):
         """Adds a row channel to the config.
 
         Args:
             config: ConfigurationSet to add to.
             channel_id: ID of the channel.
-            parameter_name: Name of the parameter.
         """
-        self.paramchannelID[parameter_name] = channel_id
         myParameterChannel = Channel(  # .NET objects, so pylint: disable=invalid-name
             channel_id,
             "MyParamChannel",
@@ -423,26 +515,57 @@ class SessionFrame:
             channel_id: ID of the channel.
             data: numpy array of float or float equivalents
             timestamps: timestamps for the datapoints
+
+        Raises:
+            TypeError: data is not numeric, or timestamps are not datetimes.
+            ValueError: data and timestamps are not the same length.
+            OverflowError: A value is too large to be stored as a 32-bit float.
         """
-        # TODO: add in guard against invalid datatypes
-        if not isinstance(timestamps, (pd.DatetimeIndex, npt.NDArray[np.datetime64])):
+        data = np.asarray(data)
+        if not np.can_cast(data.dtype, np.float64):
+            raise TypeError(f"data should be numeric, got dtype {data.dtype}.")
+        if not (
+            isinstance(timestamps, pd.DatetimeIndex)
+            or (
+                isinstance(timestamps, np.ndarray)
+                and np.issubdtype(timestamps.dtype, np.datetime64)
+            )
+        ):
             raise TypeError(
                 "timestamps should be pd.DateTimeIndex, "
                 "or numpy array of np.datetime64."
             )
-        timestamps = timestamp2long(timestamps)
+        if len(data) != len(timestamps):
+            raise ValueError(
+                f"data and timestamps should be the same length, "
+                f"got {len(data)} and {len(timestamps)}."
+            )
+        data = to_float32(data)
+        _import_dotnet()
+        timestamps = timestamp2long_array(timestamps)
+
+        # marshal each window of the channel across to .NET in one copy, rather than
+        # crossing the pythonnet boundary per sample. Windowing bounds the extra memory
+        # held in .NET for very long channels.
+        for start in range(0, len(data), _ROW_DATA_CHUNK_SIZE):
+            stop = start + _ROW_DATA_CHUNK_SIZE
+            timestamps_array = to_net_array(
+                np.ascontiguousarray(timestamps[start:stop]), Int64
+            )
+            add_row_data(session, channel_id, data[start:stop], timestamps_array)
 
-        channelIds = NETList[UInt32]()  # .NET objects, so pylint: disable=invalid-name
-        channelIds.Add(channel_id)
 
-        # databytes = data.astype(np.float32).tobytes()
-        databytes = bytearray(len(data) * 4)
-        for i, value in enumerate(data):
-            new_bytes = struct.pack("f", value)
-            databytes[i * 4 : i * 4 + len(new_bytes)] = new_bytes
+def _progress(iterable, show_progress_bar: bool, **kwargs):
+    """Wraps iterable in a progress bar, or returns it untouched if it is not shown.
 
-        timestamps_array = Array[Int64](len(timestamps))
-        for i, timestamp in enumerate(timestamps):
-            timestamps_array[i] = Int64(int(timestamp))
+    Args:
+        iterable: Iterable to report progress on.
+        show_progress_bar: Whether to show the progress bar.
+        **kwargs: Passed on to tqdm.
 
-        session.AddRowData(channel_id, timestamps_array, databytes, 4, False)
+    Returns:
+        tqdm wrapping iterable, or iterable itself.
+    """
+    if not show_progress_bar:
+        return iterable
+    return tqdm(iterable, mininterval=_PROGRESS_BAR_INTERVAL, **kwargs)
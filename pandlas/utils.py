@@ -20,7 +20,7 @@ def timestamp2long(
         Array of int64 representing ns passed since midnight of start date.
 
     Raises:
-        OverflowError: If the output floats are larger than a C# long can handle
+        OverflowError: If the output is larger than a C# long can handle
     """
 
     if start_date is None:
@@ -34,23 +34,70 @@ def timestamp2long(
                 start_date = timestamp[0]
             except IndexError:
                 start_date = timestamp
-    ddays = (timestamp - start_date.floor("D")).days
-    ns_in_day = (
-        (timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second) * 1e9
-        + timestamp.microsecond * 1e3
-        + timestamp.nanosecond
-    )
-    long = ns_in_day + ddays * 24 * 3600 * 1e9
-
-    if isinstance(timestamp, pd.Timestamp):
-        long = np.int64(long)
-    else:
-        long = long.astype(np.int64)
 
-    if np.array(long > 2**63).max():
+    if not isinstance(timestamp, pd.Timestamp):
+        return pd.Index(timestamp2long_array(timestamp, start_date))
+
+    # count from midnight in the local wall time of the timestamp
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_localize(None)
+    ns = timestamp.value - _midnight(start_date)
+    _check_overflow(ns, ns)
+    return np.int64(ns)
+
+
+def timestamp2long_array(
+    timestamps: Union[pd.DatetimeIndex, np.ndarray], start_date: pd.Timestamp = None
+) -> np.ndarray:
+    """Convert an array of timestamps to ns from the midnight of start date.
+
+    Fast path of timestamp2long for array input, it skips the type dispatch and the
+    pd.Index wrapper and returns the int64 numpy array directly.
+
+    Args:
+        timestamps: DatetimeIndex or datetime64 array of timestamps to be converted.
+        start_date: The date to count from. If no date is passed in then it will take
+            the first timestamp as the first day.
+
+    Returns:
+        numpy array of int64 representing ns passed since midnight of start date.
+
+    Raises:
+        OverflowError: If the output is larger than a C# long can handle
+    """
+    # count from midnight in the local wall time of the timestamps
+    if getattr(timestamps, "tz", None) is not None:
+        timestamps = timestamps.tz_localize(None)
+    # work on the int64 ns since epoch directly, rather than rebuilding it from the
+    # hour/minute/second/... components
+    ns = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+    if len(ns) == 0:
+        return ns.copy()
+    if start_date is None:
+        start_date = pd.Timestamp(ns[0])
+    midnight = _midnight(start_date)
+    _check_overflow(int(ns.min()) - midnight, int(ns.max()) - midnight)
+    return ns - midnight
+
+
+def _midnight(start_date) -> int:
+    """Returns the midnight of start_date in its local wall time, as ns since epoch."""
+    start_date = pd.Timestamp(start_date)
+    if start_date.tz is not None:
+        start_date = start_date.tz_localize(None)
+    return start_date.floor("D").value
+
+
+def _check_overflow(low: int, high: int):
+    """Raises OverflowError if the python int range [low, high] does not fit in int64.
+
+    The conversion is monotonic, so only the extremes need checking, and they are
+    checked as python ints before the int64 arithmetic silently wraps around.
+    """
+    int64_info = np.iinfo(np.int64)
+    if low < int64_info.min or high > int64_info.max:
         logging.error("Timestamp is too large to be represented by long.")
         raise OverflowError("Timestamp is too large to be represented by long")
-    return long
 
 
 def long2timestamp(
@@ -63,27 +110,56 @@ def long2timestamp(
         start_date: The date to start counting from.
 
     Returns:
-        Series of pandas Timestamp
+        DatetimeIndex of the timestamps, or a Series/Timestamp if long is a Series or
+        a scalar.
     """
-    time_in_day = long.astype("timedelta64[ns]")
     if isinstance(start_date, pd.Timestamp):
         start_date = start_date.to_numpy().astype("datetime64[D]")
     elif isinstance(start_date, np.datetime64):
         start_date = start_date.astype("datetime64[D]")
     else:
         raise TypeError("start_date should be pd.Timestamp or np.datetime64")
-    return pd.to_datetime(start_date + time_in_day)
+    midnight = start_date.astype("datetime64[ns]").view(np.int64)
+
+    # add in the int64 ns domain and reinterpret the result as datetime64[ns], rather
+    # than going through timedelta arithmetic and pd.to_datetime.
+    ns = (np.asarray(long, dtype=np.int64) + midnight).view("datetime64[ns]")
+    if ns.ndim == 0:
+        return pd.Timestamp(ns)
+    if isinstance(long, pd.Series):
+        return pd.Series(ns, index=long.index, name=long.name)
+    return pd.DatetimeIndex(ns, copy=False)
 
 
-def is_port_in_use(port: int, ip="localhost") -> bool:
+def is_port_in_use(port: int, ip="localhost", timeout: float = 0.5) -> bool:
     """Checks if the port is in use
 
     Args:
         port: port number
         ip: ip
+        timeout: seconds to wait for the connection, so an address that drops the
+            connection attempt does not block for the OS default connect timeout.
 
     Returns:
         True if the port is in use, else false.
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
         return s.connect_ex((ip, port)) == 0
+
+
+def get_free_port(ip="127.0.0.1") -> int:
+    """Asks the OS for a port that is currently free.
+
+    Binding to port 0 lets the kernel pick an unused port in one call, rather than
+    probing the ports one at a time.
+
+    Args:
+        ip: ip to bind to, must be an address of this machine.
+
+    Returns:
+        A free port number.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((ip, 0))
+        return s.getsockname()[1]
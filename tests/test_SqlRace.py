@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pandlas.SqlRace import _status_values, add_laps, add_markers, write_samples
+
+
+class Test_status_values:
+    # integer values of DataStatusType, as read from the DataStatus arrays
+    SAMPLE, MISSING, INVALID = 0, 1, 2
+
+    def test_mixed_statuses_single_filter(self):
+        status = np.array([self.SAMPLE, self.MISSING, self.SAMPLE, self.INVALID])
+        mask = np.isin(status, _status_values(self.SAMPLE))
+        assert mask.tolist() == [True, False, True, False]
+
+    def test_mixed_statuses_list_filter(self):
+        status = np.array([self.SAMPLE, self.MISSING, self.SAMPLE, self.INVALID])
+        mask = np.isin(status, _status_values([self.SAMPLE, self.INVALID]))
+        assert mask.tolist() == [True, False, True, True]
+
+
+class Test_add_laps:
+    def test_mismatched_lengths(self):
+        timestamps = pd.date_range("2024-01-01", periods=3, freq="min")
+        with pytest.raises(ValueError):
+            add_laps(None, timestamps, lap_numbers=[1, 2])
+        with pytest.raises(ValueError):
+            add_laps(None, timestamps, lap_names=["Out lap"])
+
+
+class Test_add_markers:
+    def test_mismatched_lengths(self):
+        marker_times = pd.date_range("2024-01-01", periods=2, freq="min")
+        with pytest.raises(ValueError):
+            add_markers(None, marker_times, ["Start"])
+        with pytest.raises(ValueError):
+            add_markers(None, marker_times, ["Start", "End"], marker_times[:1])
+
+
+class Test_write_samples:
+    def test_mismatched_shape(self):
+        timestamps = np.arange(3, dtype=np.int64)
+        with pytest.raises(ValueError):
+            write_samples(None, [1, 2], timestamps, np.zeros((3, 3)))
+        with pytest.raises(ValueError):
+            write_samples(None, [1], timestamps, np.zeros(2))
+
+    def test_float32_overflow(self):
+        timestamps = np.arange(2, dtype=np.int64)
+        with pytest.raises(OverflowError):
+            write_samples(None, [1], timestamps, np.array([1.0, -1e39]))
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import pandlas.automation
+import pandlas.SqlRace
+from pandlas._dotnet import check_float32_overflow, dotnet_getattr, to_float32
+
+_bound = False
+
+
+def _import_dotnet():
+    # stands in for a module's .NET imports
+    global Lap, _bound  # pylint: disable=global-variable-undefined
+    Lap = "Lap"
+    _bound = True
+
+
+__getattr__ = dotnet_getattr(globals(), _import_dotnet, ("Lap",))
+
+
+class Test_dotnet_getattr:
+    def test_binds_names_on_first_access(self):
+        assert __getattr__("Lap") == "Lap"
+        assert _bound
+
+    def test_unknown_name_raises(self):
+        with pytest.raises(AttributeError):
+            __getattr__("Marker")
+
+    @pytest.mark.parametrize("module", [pandlas.SqlRace, pandlas.automation])
+    def test_names_are_bound_by_import_dotnet(self, module):
+        # every name served lazily is one that _import_dotnet assigns as a global
+        assert set(module._DOTNET_NAMES) <= set(module._import_dotnet.__code__.co_names)
+
+
+class Testcheck_float32_overflow:
+    def test_finite_value_overflows(self):
+        source = np.array([1.0, -1e39])
+        with np.errstate(over="ignore"):
+            values = source.astype(np.float32)
+        with pytest.raises(OverflowError):
+            check_float32_overflow(values, source)
+
+    def test_infinite_value_is_kept(self):
+        source = np.array([1.0, np.inf, np.nan])
+        check_float32_overflow(source.astype(np.float32), source)
+
+
+class Test_to_float32:
+    def test_casts_in_range_values(self):
+        values = to_float32(np.array([1.5, -2.0, np.nan]))
+        assert values.dtype == np.float32
+        np.testing.assert_array_equal(values, [1.5, -2.0, np.nan])
+
+    def test_overflow(self):
+        with pytest.raises(OverflowError):
+            to_float32(np.array([1.0, 1e39]))
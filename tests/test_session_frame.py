@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pandlas.session_frame  # noqa: F401  registers the atlas accessor
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1.0, 2.0, 3.0]})
+
+
+class Test_add_data:
+    def test_datetime64_array_passes_type_check(self, df):
+        timestamps = np.array(["2024-01-01", "2024-01-02"], dtype="datetime64[ns]")
+        with pytest.raises(ValueError):
+            df.atlas.add_data(None, 0, np.arange(3.0), timestamps)
+
+    def test_non_datetime_timestamps(self, df):
+        with pytest.raises(TypeError):
+            df.atlas.add_data(None, 0, np.arange(3.0), np.arange(3))
+
+    def test_length_mismatch(self, df):
+        timestamps = pd.date_range("2024-01-01", periods=2, freq="s")
+        with pytest.raises(ValueError):
+            df.atlas.add_data(None, 0, np.arange(3.0), timestamps)
+
+    def test_float32_overflow(self, df):
+        timestamps = pd.date_range("2024-01-01", periods=3, freq="s")
+        with pytest.raises(OverflowError):
+            df.atlas.add_data(None, 0, np.array([1.0, 1e39, 3.0]), timestamps)
+
+
+class Test_SessionFrame_attributes:
+    def test_units_and_descriptions(self, df):
+        df.atlas.units["a"] = "m/s"
+        df.atlas.descriptions["a"] = "speed"
+        assert df.atlas.units == {"a": "m/s"}
+        assert df.atlas.descriptions == {"a": "speed"}
+
+    def test_unknown_attribute_raises(self, df):
+        with pytest.raises(AttributeError):
+            df.atlas.unit = {"a": "m/s"}
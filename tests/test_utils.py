@@ -1,9 +1,16 @@
 import random
+import socket
 import pandas as pd
 import pytest
 import numpy as np
 
-from pandlas.utils import timestamp2long, long2timestamp
+from pandlas.utils import (
+    timestamp2long,
+    timestamp2long_array,
+    long2timestamp,
+    get_free_port,
+    is_port_in_use,
+)
 
 
 class Test_timestamp2long:
@@ -35,6 +42,21 @@ class Test_timestamp2long:
         assert long[0] == 36610000000000 + 24 * 3600 * 1e9
         assert long[1] == 86399999900000 + 24 * 3600 * 1e9
 
+    def test_tz_aware_input(self):
+        ts = pd.date_range(
+            "2021-07-01 10:10:10", "2021-07-01 23:59:59.9999", periods=2, tz="UTC"
+        ).tz_convert("Europe/London")
+        long = timestamp2long(ts)
+        assert long[0] == 36610000000000 + 3600 * int(1e9)
+        assert long[1] == 86399999900000 + 3600 * int(1e9)
+
+    def test_overflow(self):
+        ts = pd.DatetimeIndex(["2262-04-11", "2262-04-11"])
+        with pytest.raises(OverflowError):
+            timestamp2long(ts, start_date=pd.Timestamp("1677-09-22"))
+        with pytest.raises(OverflowError):
+            timestamp2long(ts[0], start_date=pd.Timestamp("1677-09-22"))
+
     def test_round_trip(self):
         ts = pd.date_range("2021-01-02 10:10:10", "2021-01-02 23:59:59.9999", periods=2)
         start_date = pd.Timestamp("2021-01-01")
@@ -43,6 +65,22 @@ class Test_timestamp2long:
         np.equal(ts, ts2)
 
 
+class Test_timestamp2long_array:
+    def test_matches_timestamp2long(self):
+        ts = pd.date_range("2021-01-01 10:10:10", "2021-01-02 23:59:59.9999", periods=7)
+        long = timestamp2long_array(ts)
+        assert isinstance(long, np.ndarray) and long.dtype == np.int64
+        np.testing.assert_array_equal(long, timestamp2long(ts))
+        start_date = pd.Timestamp("2020-12-31")
+        np.testing.assert_array_equal(
+            timestamp2long_array(ts.to_numpy(), start_date),
+            timestamp2long(ts, start_date),
+        )
+
+    def test_empty(self):
+        assert len(timestamp2long_array(pd.DatetimeIndex([]))) == 0
+
+
 class Test_long2timestamp:
     def test_long_input(self):
         long = np.array([36610000000000])
@@ -80,3 +118,18 @@ class Test_long2timestamp:
         ts2 = long2timestamp(long, np.datetime64(epoch, "ms"))
         print(ts, ts2)
         assert ts == ts2
+
+
+class Test_get_free_port:
+    def test_port_is_free(self):
+        port = get_free_port()
+        assert 0 < port < 65536
+        assert not is_port_in_use(port, "127.0.0.1")
+
+
+class Test_is_port_in_use:
+    def test_listening_port(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            s.listen()
+            assert is_port_in_use(s.getsockname()[1], "127.0.0.1", timeout=0.1)